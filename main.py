@@ -9,13 +9,15 @@ Micro features ported from nanoclaw:
   - Tool call loop (replaces dangerous recursion)
   - Graceful shutdown handler
   - Token estimator
+  - Isolated skill workers (timeouts, memory limits, parallel tool calls)
 """
-import os, json, time, sqlite3, signal, sys
+import os, time, sqlite3, signal, sys, threading, weakref
 from pathlib import Path
 from typing import Generator
 from dotenv import load_dotenv
 from openai import OpenAI
 from skills import load_skills
+from skill_pool import SkillPool, DEFAULT_WORKERS, DEFAULT_TIMEOUT, DEFAULT_MAX_RSS_MB, DEFAULT_MAX_CALLS
 
 load_dotenv()
 
@@ -36,8 +38,13 @@ def _estimate_tokens(messages: list) -> int:
     return sum(len(str(m.get("content") or "")) for m in messages) // 4
 
 
+_CORES: "weakref.WeakSet[GeoclawCore]" = weakref.WeakSet()   # live cores, cancelled on exit
+
+
 def _shutdown(sig, frame):
     print("\n[Geoclaw] Shutting down gracefully.")
+    for core in list(_CORES):
+        core.shutdown()
     sys.exit(0)
 
 signal.signal(signal.SIGINT,  _shutdown)
@@ -84,8 +91,18 @@ class GeoclawCore:
         )
         self.model  = os.getenv("MODEL_NAME", "qwen2.5:14b-instruct-q4_K_M")
         self.skills = load_skills()
+        self.pool   = SkillPool(
+            self.skills,
+            workers      = int(os.getenv("SKILL_WORKERS",    DEFAULT_WORKERS)),
+            timeout      = float(os.getenv("SKILL_TIMEOUT",  DEFAULT_TIMEOUT)),
+            max_rss_mb   = int(os.getenv("SKILL_MAX_RSS_MB", DEFAULT_MAX_RSS_MB)),
+            max_calls    = int(os.getenv("SKILL_MAX_CALLS",  DEFAULT_MAX_CALLS)),
+            start_method = os.getenv("SKILL_START_METHOD") or None,
+        )
+        self.cancel_event = threading.Event()   # set → in-flight skill calls abort
         self.history: list = [{"role": "system", "content": SYSTEM_PROMPT}]
         self.history += _load_history()
+        _CORES.add(self)
 
     # ── token info ─────────────────────────────────────────────────────────────
     @property
@@ -120,13 +137,18 @@ class GeoclawCore:
         raise RuntimeError(f"API failed after {RETRY_ATTEMPTS} attempts: {last_err}")
 
     # ── tool executor ──────────────────────────────────────────────────────────
-    def _run_tool(self, name: str, args_json: str) -> str:
-        if name not in self.skills:
-            return f"[error] Unknown skill: {name}"
-        try:
-            return str(self.skills[name].handler(**json.loads(args_json)))
-        except Exception as e:
-            return f"[error] Skill '{name}' failed: {e}"
+    def _run_tools(self, calls: list[tuple[str, str]]) -> list[str]:
+        """Run all tool calls of one round in parallel worker processes."""
+        return self.pool.run_many(calls, cancel=self.cancel_event)
+
+    # ── cancellation / shutdown ────────────────────────────────────────────────
+    def cancel(self):
+        """Abort skill calls of the current turn (their workers are replaced)."""
+        self.cancel_event.set()
+
+    def shutdown(self):
+        self.cancel_event.set()
+        self.pool.close()
 
     # ── blocking run ───────────────────────────────────────────────────────────
     def run(self, txt: str) -> str:
@@ -134,6 +156,7 @@ class GeoclawCore:
         self.history.append({"role": "user", "content": txt})
         _save_message("user", txt)
         self._trim_history()
+        self.cancel_event.clear()
 
         tools = [s.to_openai_tool() for s in self.skills.values()] or None
 
@@ -150,8 +173,10 @@ class GeoclawCore:
 
                 # execute tool calls
                 self.history.append(msg)
-                for tc in msg.tool_calls:
-                    result = self._run_tool(tc.function.name, tc.function.arguments)
+                results = self._run_tools(
+                    [(tc.function.name, tc.function.arguments) for tc in msg.tool_calls]
+                )
+                for tc, result in zip(msg.tool_calls, results):
                     self.history.append({
                         "role":        "tool",
                         "tool_call_id": tc.id,
@@ -174,6 +199,7 @@ class GeoclawCore:
         self.history.append({"role": "user", "content": txt})
         _save_message("user", txt)
         self._trim_history()
+        self.cancel_event.clear()
 
         tools = [s.to_openai_tool() for s in self.skills.values()] or None
 
@@ -216,9 +242,11 @@ class GeoclawCore:
                         self.history.append({"role": "assistant", "content": full_content})
 
                     yield "\n\n"
-                    for buf in tc_buffer.values():
+                    bufs = list(tc_buffer.values())
+                    for buf in bufs:
                         yield f"[tool: {buf['name']}]\n"
-                        result = self._run_tool(buf["name"], buf["args"])
+                    results = self._run_tools([(b["name"], b["args"]) for b in bufs])
+                    for buf, result in zip(bufs, results):
                         self.history.append({
                             "role":         "tool",
                             "tool_call_id": buf["id"],
@@ -0,0 +1,258 @@
+"""
+GeoClaw Enterprise — Isolated skill execution pool.
+
+Skills run in warm subprocess workers instead of the agent's own thread:
+  - Pre-started workers with every skill module already imported
+  - Wall-clock timeout per call (hung scrapers get killed, not waited on)
+  - RSS memory limit per worker (a greedy skill can't take down the bee),
+    backed by a hard RLIMIT_AS cap where the OS supports it
+  - Cooperative cancellation via threading.Event
+  - Workers recycled after N calls (keeps leaks in check)
+  - Arguments validated against the skill's pydantic schema before dispatch
+  - Parallel dispatch across cores (no GIL contention between skills)
+"""
+import json, os, signal, sys, threading, time, atexit
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from queue import Queue
+import psutil
+from skills import load_skills
+
+try:
+    import resource   # POSIX only; Windows workers rely on the RSS poll alone
+except ImportError:
+    resource = None
+
+# ── constants ──────────────────────────────────────────────────────────────────
+DEFAULT_WORKERS    = max(2, min(4, os.cpu_count() or 2))
+DEFAULT_TIMEOUT    = 30.0   # seconds of wall-clock per skill call
+DEFAULT_MAX_RSS_MB = 512    # worker is killed above this resident set size
+AS_HEADROOM        = 2      # hard RLIMIT_AS = max_rss_mb * this (virtual > resident)
+DEFAULT_MAX_CALLS  = 100    # worker is recycled after this many calls
+STARTUP_TIMEOUT    = 60.0   # seconds a fresh worker may spend importing skills
+POLL_INTERVAL      = 0.05   # seconds between timeout / RSS / cancel checks
+
+
+_START_LOCK = threading.Lock()
+
+
+@contextmanager
+def _without_main():
+    """Hide the launching script from multiprocessing while a worker starts.
+
+    spawn/forkserver children otherwise re-run it as __mp_main__: under tui.py
+    that re-imports textual, openai and main.py (and its signal handlers) into
+    every worker. The worker entry point lives here, so it never needs __main__.
+    """
+    main = sys.modules.get("__main__")
+    with _START_LOCK:
+        saved = {k: main.__dict__.pop(k) for k in ("__file__", "__spec__")
+                 if main is not None and k in main.__dict__}
+        if main is not None:
+            main.__spec__ = None
+        try:
+            yield
+        finally:
+            if main is not None:
+                del main.__spec__
+                main.__dict__.update(saved)
+
+
+def _default_start_method() -> str:
+    """forkserver where available, else spawn; fork is never picked implicitly."""
+    return "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+
+
+# ── worker process ─────────────────────────────────────────────────────────────
+def _worker_main(conn, max_as_mb: int = 0):
+    """Subprocess entry: preload skills, then serve (name, kwargs) requests."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # parent owns Ctrl+C
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)  # never the agent's _shutdown
+    if hasattr(os, "setsid"):
+        os.setsid()   # own process group: a kill takes the skill's children with it
+    if resource is not None and max_as_mb:
+        # hard cap: one huge allocation fails with MemoryError instead of
+        # reaching the OOM killer between two RSS polls
+        limit = max_as_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+    skills = load_skills()
+    conn.send(("ready", os.getpid()))
+    while True:
+        try:
+            req = conn.recv()
+        except (EOFError, OSError):
+            return
+        if req is None:
+            return
+        name, kwargs = req
+        try:
+            conn.send(("ok", str(skills[name].handler(**kwargs))))
+        except MemoryError:
+            conn.send(("oom", ""))
+            return   # heap may be wrecked; let the pool replace this worker
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _Worker:
+    def __init__(self, ctx, max_as_mb: int = 0):
+        self.conn, child = ctx.Pipe()
+        self.proc  = ctx.Process(target=_worker_main, args=(child, max_as_mb), daemon=True)
+        with _without_main():
+            self.proc.start()
+        child.close()
+        self.calls = 0
+        self.ready = False
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Block until the worker has preloaded its skills (once per worker)."""
+        if not self.ready:
+            try:
+                self.ready = self.conn.poll(timeout) and self.conn.recv()[0] == "ready"
+            except (EOFError, OSError):
+                self.ready = False
+        return self.ready
+
+    def _descendants(self) -> list:
+        try:
+            return psutil.Process(self.proc.pid).children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def kill(self, kids: list | None = None):
+        """Kill the worker and everything it spawned (browsers, curl, ...)."""
+        kids = self._descendants() if kids is None else kids
+        if self.proc.is_alive():
+            if hasattr(os, "killpg"):
+                try:
+                    os.killpg(self.proc.pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            self.proc.kill()
+        for kid in kids:   # also catches children that left the process group
+            try:
+                kid.kill()
+            except psutil.Error:
+                pass
+        self.proc.join(timeout=1)
+        self.conn.close()
+
+    def stop(self):
+        kids = self._descendants()
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.proc.join(timeout=1)
+        self.kill(kids)   # the worker may have exited, but its children have not
+
+    def rss_mb(self) -> float:
+        try:
+            return psutil.Process(self.proc.pid).memory_info().rss / (1024 * 1024)
+        except psutil.Error:
+            return 0.0
+
+
+# ── pool ───────────────────────────────────────────────────────────────────────
+class SkillPool:
+
+    def __init__(self, skills: dict, workers: int = DEFAULT_WORKERS,
+                 timeout: float = DEFAULT_TIMEOUT, max_rss_mb: int = DEFAULT_MAX_RSS_MB,
+                 max_calls: int = DEFAULT_MAX_CALLS, start_method: str | None = None):
+        self.skills     = skills
+        self.timeout    = timeout
+        self.max_rss_mb = max_rss_mb
+        self.max_as_mb  = max_rss_mb * AS_HEADROOM
+        self.max_calls  = max_calls
+        self._ctx       = mp.get_context(start_method or _default_start_method())
+        if self._ctx.get_start_method() == "forkserver":
+            # warm the server once; every worker forks from it with skills imported
+            self._ctx.set_forkserver_preload(
+                ["skills"] + sorted({s.handler.__module__ for s in skills.values()})
+            )
+        self._idle: Queue = Queue()
+        self._size      = max(1, workers)
+        self._closed    = False
+        for _ in range(self._size):
+            self._idle.put(_Worker(self._ctx, self.max_as_mb))
+        self._executor  = ThreadPoolExecutor(max_workers=self._size)
+        atexit.register(self.close)
+
+    # ── validation ─────────────────────────────────────────────────────────────
+    def _validate(self, name: str, args_json: str) -> dict:
+        """Parse + validate tool arguments in the parent; raises on bad input."""
+        model = self.skills[name].args_schema(**json.loads(args_json or "{}"))
+        return model.model_dump() if hasattr(model, "model_dump") else model.dict()
+
+    # ── single call ────────────────────────────────────────────────────────────
+    def run(self, name: str, args_json: str, cancel: threading.Event | None = None) -> str:
+        if name not in self.skills:
+            return f"[error] Unknown skill: {name}"
+        try:
+            kwargs = self._validate(name, args_json)
+        except Exception as e:
+            return f"[error] Invalid arguments for '{name}': {e}"
+
+        worker = self._idle.get()
+        healthy = False
+        try:
+            if not worker.wait_ready(STARTUP_TIMEOUT):
+                return f"[error] Skill '{name}' worker failed to start (exit code {worker.proc.exitcode})."
+            worker.conn.send((name, kwargs))
+            worker.calls += 1
+            deadline = time.monotonic() + self.timeout
+            while True:
+                if worker.conn.poll(POLL_INTERVAL):
+                    status, payload = worker.conn.recv()
+                    if status == "oom":
+                        return f"[error] Skill '{name}' exceeded {self.max_as_mb} MB hard memory limit."
+                    healthy = True
+                    if status == "ok":
+                        return payload
+                    return f"[error] Skill '{name}' failed: {payload}"
+                if cancel is not None and cancel.is_set():
+                    return f"[error] Skill '{name}' cancelled."
+                if time.monotonic() > deadline:
+                    return f"[error] Skill '{name}' timed out after {self.timeout:g}s."
+                if self.max_rss_mb and worker.rss_mb() > self.max_rss_mb:
+                    return f"[error] Skill '{name}' exceeded {self.max_rss_mb} MB memory limit."
+                if not worker.proc.is_alive():
+                    return f"[error] Skill '{name}' crashed (exit code {worker.proc.exitcode})."
+        except (EOFError, BrokenPipeError, OSError) as e:
+            return f"[error] Skill '{name}' worker died: {e}"
+        finally:
+            self._release(worker, healthy)
+
+    def _release(self, worker: _Worker, healthy: bool):
+        """Return a worker to the pool, replacing it if killed or worn out."""
+        if self._closed:
+            worker.kill()
+            return
+        if not healthy:
+            worker.kill()
+        elif worker.calls >= self.max_calls:
+            worker.stop()
+        else:
+            self._idle.put(worker)
+            return
+        self._idle.put(_Worker(self._ctx, self.max_as_mb))
+
+    # ── parallel calls ─────────────────────────────────────────────────────────
+    def run_many(self, calls: list[tuple[str, str]],
+                 cancel: threading.Event | None = None) -> list[str]:
+        """Run (name, args_json) pairs concurrently; results keep input order."""
+        futures = [self._executor.submit(self.run, n, a, cancel) for n, a in calls]
+        return [f.result() for f in futures]
+
+    # ── shutdown ───────────────────────────────────────────────────────────────
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        while not self._idle.empty():
+            self._idle.get_nowait().stop()
@@ -0,0 +1,380 @@
+"""
+map_normalize — batch-normalize forager reports into hive map pins.
+
+One tool call handles a whole sweep: records are read in chunks, validated
+and normalized with NumPy (coordinates, timestamps, threat_level), near-identical
+pins are collapsed on a spatial grid + time bucket, and the result is written
+incrementally as NDJSON or GeoJSON so memory stays flat however big the sweep is.
+"""
+import json, os, re, tempfile, time, warnings
+from collections import OrderedDict
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Literal
+import numpy as np
+from pydantic import BaseModel, Field
+from . import Skill
+
+# ── constants ──────────────────────────────────────────────────────────────────
+DATA_DIR        = Path("data")   # outputs may only land under here
+DEFAULT_OUTPUT  = "data/hive-stream.ndjson"
+DEFAULT_CHUNK   = 1000
+READ_SIZE       = 1 << 16   # bytes per read when streaming .json/.geojson input
+DEFAULT_GRID    = 1e-4   # degrees (~11 m at the equator)
+DEFAULT_BUCKET  = 300    # seconds
+MAX_TS          = 4_102_444_800.0   # 2100-01-01T00:00Z; later (or negative) epochs are junk
+DEDUP_MAX_KEYS  = 100_000   # distinct pins remembered for dedup (oldest forgotten first)
+
+LAT_KEYS = ("lat", "latitude")
+LON_KEYS = ("lon", "lng", "long", "longitude")
+TS_KEYS  = ("ts", "timestamp", "time", "datetime")
+
+THREAT_LEVELS = ("low", "medium", "high", "critical")
+THREAT_ALIASES = {
+    "low": "low", "l": "low", "minor": "low", "green": "low", "0": "low", "1": "low",
+    "medium": "medium", "med": "medium", "m": "medium", "moderate": "medium",
+    "amber": "medium", "yellow": "medium", "2": "medium",
+    "high": "high", "h": "high", "severe": "high", "red": "high", "3": "high",
+    "critical": "critical", "crit": "critical", "c": "critical", "4": "critical",
+}
+_ALIAS_KEYS   = np.array(sorted(THREAT_ALIASES))
+_ALIAS_VALUES = np.array([THREAT_ALIASES[k] for k in _ALIAS_KEYS])
+
+
+class A(BaseModel):
+    records: list[dict] = []
+    input_path: str | None = None
+    output_path: str = DEFAULT_OUTPUT
+    output_format: Literal["ndjson", "geojson"] = "ndjson"
+    grid_deg: float = Field(DEFAULT_GRID, gt=0, le=1)
+    bucket_s: int = Field(DEFAULT_BUCKET, ge=1, le=86_400)
+    chunk_size: int = Field(DEFAULT_CHUNK, ge=1, le=100_000)
+
+
+# ── input ──────────────────────────────────────────────────────────────────────
+def _flatten(rec: dict) -> dict:
+    """Accept GeoJSON Features as well as flat records."""
+    if rec.get("type") == "Feature":
+        props, geom = rec.get("properties"), rec.get("geometry")
+        flat   = dict(props) if isinstance(props, dict) else {}
+        coords = geom.get("coordinates") if isinstance(geom, dict) else None
+        if isinstance(coords, (list, tuple)) and len(coords) >= 2:
+            flat["lon"], flat["lat"] = coords[0], coords[1]
+        else:   # a Feature is located by its geometry; malformed → counted invalid
+            for k in LAT_KEYS + LON_KEYS:
+                flat.pop(k, None)
+        return flat
+    return rec
+
+
+class _JsonStream:
+    """Pull reader over a text file: whitespace skipping + raw_decode with refills."""
+
+    def __init__(self, f):
+        self.f, self.buf, self.pos, self.dec = f, "", 0, json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        more = self.f.read(READ_SIZE)
+        if not more:
+            return False
+        self.buf, self.pos = self.buf[self.pos:] + more, 0   # drop what's consumed
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, '' at EOF."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, ch: str):
+        if self.peek() != ch:
+            raise json.JSONDecodeError(f"Expecting {ch!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """Decode one complete JSON value (nested objects/arrays included)."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.dec.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a value touching the buffer end may be cut short ("12" of "12.5")
+            if not _DELIM.search(self.buf, end) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+_DELIM = re.compile(r"[\s,\]}]")
+
+
+def _iter_array(js: _JsonStream) -> Iterator:
+    js.take("[")
+    if js.peek() == "]":
+        return
+    while True:
+        yield js.value()
+        if js.peek() == "]":
+            return
+        js.take(",")
+
+
+def _iter_json(f) -> Iterator[dict]:
+    """Stream a JSON array or a FeatureCollection's top-level "features" array.
+
+    Only the root object's own "features" key is streamed; other values
+    (including any nested "features") are decoded whole. A root object
+    without one, such as a single Feature, is yielded as one record.
+    """
+    js = _JsonStream(f)
+    if js.peek() == "[":
+        yield from _iter_array(js)
+        return
+    js.take("{")
+    head: dict = {}
+    first = True
+    while js.peek() != "}":
+        if not first:
+            js.take(",")
+        first = False
+        key = js.value()
+        js.take(":")
+        if key == "features" and js.peek() == "[":
+            yield from _iter_array(js)
+            return   # rest of the collection (crs, bbox, ...) is not needed
+        head[key] = js.value()
+    yield head
+
+
+def _iter_records(records: list[dict], input_path: Path | None) -> Iterator[dict]:
+    yield from records
+    if not input_path:
+        return
+    with open(input_path, encoding="utf-8") as f:
+        if input_path.suffix in (".json", ".geojson"):
+            yield from _iter_json(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _chunks(it: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    """Non-dict records become {} so they are still read and counted invalid."""
+    while chunk := list(islice(it, size)):
+        yield [_flatten(r) if isinstance(r, dict) else {} for r in chunk]
+
+
+def _first(rec: dict, keys: tuple):
+    for k in keys:
+        if rec.get(k) is not None:
+            return rec[k]
+    return None
+
+
+def _num(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+# ── vectorized normalization ───────────────────────────────────────────────────
+# the one string format both parse paths accept (NumPy alone also takes "now",
+# "today", "NaT", "2024-02", ...; fromisoformat alone takes "20240220T1100")
+_ISO = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}(?::\d{2}(?::\d{2}(?:\.\d{1,9})?)?)?)?(?:Z|[+-]\d{2}:?\d{2})?"
+)
+
+
+def _parse_ts_one(s: str) -> float:
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        return np.nan
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return np.floor(dt.timestamp() * 1000) / 1000.0   # ms, like the datetime64[ms] path
+
+
+def _epoch_s(v: np.ndarray) -> np.ndarray:
+    return np.where(v > 1e11, v / 1000.0, v)   # epoch milliseconds → seconds
+
+
+def _timestamps(raw: list, now: float) -> np.ndarray:
+    """Epoch seconds; numbers (s or ms, also as strings) and ISO-8601, missing → now."""
+    out    = _epoch_s(np.array([_num(v) if not isinstance(v, (str, bool)) else np.nan for v in raw]))
+    is_str = np.array([isinstance(v, str) for v in raw], dtype=bool)
+    blank  = np.zeros(len(raw), dtype=bool)
+    if is_str.any():
+        strs = np.char.strip(np.array([v for v in raw if isinstance(v, str)], dtype=str))
+        vals = _epoch_s(np.array([_num(s) for s in strs]))   # "1708426800" etc.
+        iso  = ~np.isfinite(vals) & np.array([_ISO.fullmatch(s) is not None for s in strs], dtype=bool)
+        if iso.any():
+            try:   # fast path: ISO strings parse in one shot (offsets folded to UTC)
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    parsed = np.array(np.char.rstrip(strs[iso], "Z"), dtype="datetime64[ms]")
+                vals[iso] = np.where(np.isnat(parsed), np.nan, parsed.astype("int64") / 1000.0)
+            except ValueError:
+                vals[iso] = [_parse_ts_one(s) for s in strs[iso]]
+        out[is_str] = vals
+        blank[is_str] = strs == ""
+    out[blank | np.array([v is None for v in raw], dtype=bool)] = now
+    return out
+
+
+def _threat_levels(raw: list) -> np.ndarray:
+    vals = np.char.lower(np.char.strip(np.array(["" if v is None else str(v) for v in raw], dtype=str)))
+    idx  = np.clip(np.searchsorted(_ALIAS_KEYS, vals), 0, len(_ALIAS_KEYS) - 1)
+    return np.where(_ALIAS_KEYS[idx] == vals, _ALIAS_VALUES[idx], "unknown")
+
+
+def _normalize(chunk: list[dict], now: float):
+    """Returns (lat, lon, ts, threat, valid_mask) arrays for one chunk."""
+    lat = np.array([_num(_first(r, LAT_KEYS)) for r in chunk])
+    lon = np.array([_num(_first(r, LON_KEYS)) for r in chunk])
+    ts  = _timestamps([_first(r, TS_KEYS) for r in chunk], now)
+    threat = _threat_levels([r.get("threat_level") for r in chunk])
+    valid  = (np.isfinite(lat) & np.isfinite(lon) & np.isfinite(ts)
+              & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+              & (ts >= 0) & (ts < MAX_TS))
+    return lat, lon, ts, threat, valid
+
+
+# ── dedup ──────────────────────────────────────────────────────────────────────
+class _Deduper:
+    """Grid + time-bucket dedup over the last DEDUP_MAX_KEYS distinct pins.
+
+    Bounded by key count rather than by time, so unsorted input (or a record
+    stamped with ingest time) doesn't flush the keys of older buckets.
+    """
+
+    def __init__(self, grid_deg: float, bucket_s: int, max_keys: int = DEDUP_MAX_KEYS):
+        self.grid, self.bucket, self.max_keys = grid_deg, max(1, bucket_s), max_keys
+        self.seen: OrderedDict[tuple, None] = OrderedDict()
+
+    def keep(self, lat, lon, ts) -> np.ndarray:
+        keys = np.stack([
+            np.round(lat / self.grid), np.round(lon / self.grid), np.floor(ts / self.bucket)
+        ], axis=1).astype(np.int64)
+        mask = np.zeros(len(keys), dtype=bool)
+        if not len(keys):
+            return mask
+        uniq, first = np.unique(keys, axis=0, return_index=True)   # in-chunk dupes
+        for key, i in zip(map(tuple, uniq.tolist()), first.tolist()):
+            if key in self.seen:
+                self.seen.move_to_end(key)
+                continue
+            self.seen[key] = None
+            mask[i] = True
+        while len(self.seen) > self.max_keys:
+            self.seen.popitem(last=False)
+        return mask
+
+
+# ── output ─────────────────────────────────────────────────────────────────────
+def _resolve_paths(input_path: str | None, output_path: str) -> tuple[Path | None, Path]:
+    """Pin output under data/ and never let it clobber the input."""
+    data = DATA_DIR.resolve()
+    out  = Path(output_path).resolve()
+    if not out.is_relative_to(data):
+        raise ValueError(f"output_path must be inside {DATA_DIR}/: {output_path}")
+    src = Path(input_path).resolve() if input_path else None
+    if src is not None and src == out:
+        raise ValueError("output_path must differ from input_path")
+    return src, out
+
+
+class _Writer:
+    """Incremental NDJSON (append) or GeoJSON FeatureCollection (temp file + swap)."""
+
+    def __init__(self, path: Path, fmt: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path, self.fmt, self.first = path, fmt, True
+        if fmt == "ndjson":
+            self.f = open(path, "a", encoding="utf-8")
+            return
+        # a killed worker leaves only a stray temp file, never a truncated collection
+        fd, self.tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(self.tmp, 0o666 & ~umask)   # mkstemp's 0600 would survive os.replace
+        self.f = os.fdopen(fd, "w", encoding="utf-8")
+        self.f.write('{"type":"FeatureCollection","features":[\n')
+
+    def write(self, pin: dict):
+        if self.fmt == "ndjson":
+            self.f.write(json.dumps(pin) + "\n")
+            return
+        props = {k: v for k, v in pin.items() if k not in ("lat", "lon")}
+        feature = {"type": "Feature",
+                   "geometry": {"type": "Point", "coordinates": [pin["lon"], pin["lat"]]},
+                   "properties": props}
+        self.f.write(("" if self.first else ",\n") + json.dumps(feature))
+        self.first = False
+
+    def close(self, ok: bool = True):
+        if self.fmt == "geojson" and ok:
+            self.f.write("\n]}\n")
+        self.f.close()
+        if self.fmt == "geojson":
+            if ok:
+                os.replace(self.tmp, self.path)
+            else:
+                os.unlink(self.tmp)
+
+
+def _attachments(v) -> list:
+    if v is None:
+        return []
+    return [str(a) for a in v] if isinstance(v, (list, tuple)) else [str(v)]
+
+
+# ── handler ────────────────────────────────────────────────────────────────────
+def h(records: list[dict] | None = None, input_path: str | None = None,
+      output_path: str = DEFAULT_OUTPUT, output_format: str = "ndjson",
+      grid_deg: float = DEFAULT_GRID, bucket_s: int = DEFAULT_BUCKET,
+      chunk_size: int = DEFAULT_CHUNK) -> str:
+    src, dst = _resolve_paths(input_path, output_path)
+    now = time.time()
+    dedup = _Deduper(grid_deg, bucket_s)
+    read = invalid = dupes = written = 0
+    out = _Writer(dst, output_format)
+    try:
+        for chunk in _chunks(_iter_records(records or [], src), max(1, chunk_size)):
+            read += len(chunk)
+            lat, lon, ts, threat, valid = _normalize(chunk, now)
+            invalid += int((~valid).sum())
+            idx  = np.flatnonzero(valid)
+            keep = dedup.keep(lat[idx], lon[idx], ts[idx])
+            dupes += int((~keep).sum())
+            idx  = idx[keep]
+            iso  = np.datetime_as_string((ts[idx] * 1000).astype(np.int64).astype("datetime64[ms]"), unit="s")
+            for i, stamp in zip(idx.tolist(), iso.tolist()):
+                rec = chunk[i]
+                out.write({
+                    "lat":          round(float(lat[i]), 6),
+                    "lon":          round(float(lon[i]), 6),
+                    "ts":           stamp + "Z",
+                    "threat_level": str(threat[i]),
+                    "summary":      str(rec.get("summary") or ""),
+                    "attachments":  _attachments(rec.get("attachments")),
+                })
+                written += 1
+    except BaseException:
+        out.close(ok=False)
+        raise
+    out.close()
+    return (f"map_normalize: read {read}, wrote {written} pins to {output_path} "
+            f"({invalid} invalid, {dupes} duplicates dropped).")
+
+SKILL=Skill("map_normalize","Normalize a batch of raw hive reports (lat/lon, timestamp, threat_level) into deduplicated map pins written as NDJSON or GeoJSON. Pass all records in one call, or input_path for a large NDJSON/GeoJSON file. output_path must be under data/.",A,h)
@@ -0,0 +1,66 @@
+import io, json
+import numpy as np
+import pytest
+from skills import map_normalize as mn
+
+FEATURES = [
+    {"type": "Feature",
+     "geometry": {"type": "Point", "coordinates": [34.78 + i / 1000, 32.08]},
+     "properties": {"n": i, "summary": 'tricky ,]}" text', "score": 12.5}}
+    for i in range(50)
+]
+READ_SIZES = [1, 2, 3, 7, 64, 1 << 16]   # force refills at every token boundary
+
+
+def _stream(doc, indent=None):
+    return list(mn._iter_json(io.StringIO(json.dumps(doc, indent=indent))))
+
+
+@pytest.fixture(params=READ_SIZES)
+def read_size(request, monkeypatch):
+    monkeypatch.setattr(mn, "READ_SIZE", request.param)
+    return request.param
+
+
+def test_feature_collection(read_size):
+    doc = {"type": "FeatureCollection", "features": FEATURES, "bbox": [0, 0, 1, 1]}
+    assert _stream(doc) == FEATURES
+    assert _stream(doc, indent=2) == FEATURES
+
+
+def test_nested_features_key_is_ignored(read_size):
+    doc = {"type": "FeatureCollection",
+           "properties": {"features": [{"a": 1}]},
+           "features": FEATURES}
+    assert _stream(doc) == FEATURES
+
+
+def test_lone_feature_with_nested_features_key(read_size):
+    feature = dict(FEATURES[0], properties={"features": [{"a": 1}]})
+    assert _stream(feature) == [feature]
+
+
+def test_top_level_array_and_numbers_at_buffer_edges(read_size):
+    assert _stream([1.25, {"a": -3e5}, "x"]) == [1.25, {"a": -3e5}, "x"]
+    assert _stream({"count": 12.5, "features": [{"a": 1}]}) == [{"a": 1}]
+    assert _stream([]) == []
+    assert _stream({"type": "FeatureCollection", "features": []}) == []
+
+
+@pytest.mark.parametrize("bad", ['[{"a": 1}, {"b":', '{"features": [{"a": 1}', "[1 2]"])
+def test_truncated_or_malformed_input_raises(read_size, bad):
+    with pytest.raises(json.JSONDecodeError):
+        list(mn._iter_json(io.StringIO(bad)))
+
+
+TS_CASES = ["now", "today", "NaT", "2024-02", "20240220T1100", "2024-02-20",
+            "2024-02-20T11:00Z", "2024-02-20 11:00", "2024-02-20T11:00:05.123456789Z",
+            "2024-02-20T13:00+02:00", "2024-02-30", "bad"]
+
+
+@pytest.mark.parametrize("neighbour", [[], ["bad"], ["2024-02-30"], ["now"]])
+def test_timestamp_parse_does_not_depend_on_chunk(neighbour):
+    alone = [mn._timestamps([c], 0.0)[0] for c in TS_CASES]
+    batch = mn._timestamps(TS_CASES + neighbour, 0.0)[:len(TS_CASES)]
+    assert np.array_equal(alone, batch, equal_nan=True)
+    assert np.isnan(alone[:5]).all()   # NumPy-only / fromisoformat-only spellings
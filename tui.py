@@ -6,7 +6,7 @@ Micro features from nanoclaw:
   - Scrollable chat history (RichLog)
   - Token counter in footer
   - Model name display in header
-  - Keyboard shortcuts (Ctrl+L clear, Ctrl+N new session)
+  - Keyboard shortcuts (Ctrl+L clear, Ctrl+N new session, Esc cancel tools)
 """
 import os
 from dotenv import load_dotenv
@@ -38,6 +38,7 @@ class GeoclawTUI(App):
     BINDINGS = [
         Binding("ctrl+l", "clear_chat",   "Clear",       show=True),
         Binding("ctrl+n", "new_session",  "New session", show=True),
+        Binding("escape", "cancel_tools", "Cancel tools", show=True),
         Binding("ctrl+q", "quit",         "Quit",        show=True),
     ]
 
@@ -100,7 +101,13 @@ class GeoclawTUI(App):
             f"model: {model}  │  ~{tokens:,} tokens  │  {turns} turns"
         )
 
+    def on_unmount(self):
+        self.bot.shutdown()   # abort in-flight skills, stop workers
+
     # ── actions ────────────────────────────────────────────────────────────────
+    def action_cancel_tools(self):
+        self.bot.cancel()
+
     def action_clear_chat(self):
         log = self.query_one("#chat_log", RichLog)
         log.clear()